@@ -3,14 +3,28 @@
 # ───────────────────────────────────────────────────────────────
 import streamlit as st
 import pandas as pd
+import numpy as np
 import altair as alt
+from enum import Enum
 from pathlib import Path
 from io import BytesIO
-from fpdf import FPDF
+from xml.sax.saxutils import escape
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+# Kept in its own module so the compiled kernel survives Streamlit reruns
+from quote_kernels import compute_ops
 
 base_dir = Path(__file__).parent
-MATS = pd.read_csv(base_dir / "data" / "materials.csv")
-mat_ids = MATS["Material-ID"].tolist()
+
+@st.cache_data
+def load_materials(path: Path) -> tuple[pd.DataFrame, list[str]]:
+    mats = pd.read_parquet(path).set_index("Material-ID")
+    return mats, mats.index.tolist()
+
+MATS, mat_ids = load_materials(base_dir / "data" / "materials.parquet")
 
 # ───────────────────────────────────────────────────────────────
 # 1) PAGE CONFIG + TITLE
@@ -28,8 +42,7 @@ with st.sidebar:
     # Material
     st.subheader("Material")
     sel_mat = st.selectbox("Choose material", mat_ids, index=mat_ids.index("AL6061"))
-    mat_row = MATS[MATS["Material-ID"] == sel_mat].iloc[0]
-    rho_default = float(mat_row["rho_kg_mm3"])
+    rho_default = float(MATS.at[sel_mat, "rho_kg_mm3"])
 
     # Raw block
     st.header("Raw Block Dimensions (mm)")
@@ -37,12 +50,8 @@ with st.sidebar:
     W = st.number_input("Width (Y)",  value=150, min_value=1)
     H = st.number_input("Height (Z)", value=40,  min_value=1)
 
-    V_raw = L * W * H
-    raw_mass_sidebar = V_raw * rho_default
-
-    st.markdown("### Block & Volume")
-    st.write(f"Raw block volume: `{V_raw:,.0f} mm³`")
-    st.write(f"Raw material weight: `{raw_mass_sidebar:.2f} kg`")
+    # Filled in once V_final is known (see section 3)
+    block_info = st.container()
 
     st.divider()
 
@@ -63,41 +72,69 @@ with st.sidebar:
 # ───────────────────────────────────────────────────────────────
 # 3) BLOCK / CHIP VOLUMES
 # ───────────────────────────────────────────────────────────────
-V_raw  = L * W * H
-V_chip = max(V_raw - V_final, 0)
+@st.cache_data
+def derive_volumes(L: float, W: float, H: float, V_final: float) -> tuple[float, float]:
+    V_raw = L * W * H
+    V_chip = V_raw - V_final if V_raw > V_final else 0
+    return V_raw, V_chip
+
+V_raw, V_chip = derive_volumes(L, W, H, V_final)
+raw_mass_sidebar = V_raw * rho_default
+
+with block_info:
+    st.markdown("### Block & Volume")
+    st.write(f"Raw block volume: `{V_raw:,.0f} mm³`")
+    st.write(f"Raw material weight: `{raw_mass_sidebar:.2f} kg`")
 
 # ───────────────────────────────────────────────────────────────
 # 4) DEFAULT OPERATIONS TABLE
 # ───────────────────────────────────────────────────────────────
-def default_operations() -> pd.DataFrame:
+_DEFAULT_OPS_DICT = {
+    "Operation":      ["Rough 3X", "Semi-rough 5X", "Finish"],
+    "Tool Ø (mm)":    [12, 8, 6],
+    "Teeth":          [3, 2, 2],
+    "RPM":            [12000, 16000, 18000],
+    "f_z (mm)":       [0.06, 0.04, 0.03],
+    "Feed (mm/min)":  [0, 0, 0],       # manual
+    "a_p (mm)":       [8, 6, 0.5],
+    "a_e (mm)":       [4, 2, 0.2],     # manual
+    "ae % (of Ø)":    [50, 50, 10],    # %
+    "Volume Share":   [0.70, 0.25, 0.05],
+}
+
+_OP_DTYPES = {col: np.float64 for col in _DEFAULT_OPS_DICT if col != "Operation"}
+
+@st.cache_data
+def _default_ops_df() -> pd.DataFrame:
     return pd.DataFrame({
-        "Operation":      ["Rough 3X", "Semi-rough 5X", "Finish"],
-        "Tool Ø (mm)":    [12, 8, 6],
-        "Teeth":          [3, 2, 2],
-        "RPM":            [12000, 16000, 18000],
-        "f_z (mm)":       [0.06, 0.04, 0.03],
-        "Feed (mm/min)":  [0, 0, 0],       # manual
-        "a_p (mm)":       [8, 6, 0.5],
-        "a_e (mm)":       [4, 2, 0.2],     # manual
-        "ae % (of Ø)":    [50, 50, 10],    # %
-        "Volume Share":   [0.70, 0.25, 0.05],
+        col: np.asarray(vals, dtype=_OP_DTYPES.get(col, object))
+        for col, vals in _DEFAULT_OPS_DICT.items()
     })
 
 if "op_df" not in st.session_state:
-    st.session_state.op_df = default_operations()
+    # cache_data hands back a fresh copy on every call
+    st.session_state.op_df = _default_ops_df()
 
 # Mode selectors
-ae_mode = st.radio(
+class AeMode(Enum):
+    PERCENT = "Use % of tool Ø"
+    MANUAL  = "Manual aₑ (mm)"
+
+class FeedMode(Enum):
+    CALCULATE = "Calculate from RPM × fₓ × teeth"
+    MANUAL    = "Manual column 'Feed (mm/min)'"
+
+ae_mode = AeMode(st.radio(
     "aₑ input mode",
-    ["Use % of tool Ø", "Manual aₑ (mm)"],
+    [m.value for m in AeMode],
     horizontal=True,
-)
+))
 
-feed_mode = st.radio(
+feed_mode = FeedMode(st.radio(
     "Feedrate input mode",
-    ["Calculate from RPM × fₓ × teeth", "Manual column 'Feed (mm/min)'"],
+    [m.value for m in FeedMode],
     horizontal=True,
-)
+))
 
 # Data editor with auto-rerun
 op_df_edit = st.data_editor(
@@ -106,33 +143,83 @@ op_df_edit = st.data_editor(
     use_container_width=True,
     key="ops_editor",
 )
-st.session_state.op_df = op_df_edit
+st.session_state.op_df = op_df_edit.astype(_OP_DTYPES)
 
 # ───────────────────────────────────────────────────────────────
-# 5) PER-OP CALCULATIONS
+# 5) PER-OP & COST CALCULATIONS
 # ───────────────────────────────────────────────────────────────
-op_results = []
-for _, row in st.session_state.op_df.iterrows():
-    feed = (row["Teeth"] * row["RPM"] * row["f_z (mm)"]
-            if feed_mode.startswith("Calculate") else row["Feed (mm/min)"])
-
-    ae = (row["Tool Ø (mm)"] * row["ae % (of Ø)"] / 100
-          if ae_mode.startswith("Use %") else row["a_e (mm)"])
-
-    mrr      = feed * row["a_p (mm)"] * ae
-    chip_vol = V_chip * row["Volume Share"]
-    time_min = chip_vol / mrr / 60 if mrr else 0
+_COST_LABELS = np.array(["Material", "Machine", "Tool wear",
+                         "Setup labor", "Overhead"])
+
+@st.cache_data
+def compute_costs(V_raw: float, mat_density: float, mat_price: float,
+                  mach_time_min: float, machine_rate: float, tool_cost: float,
+                  setup_time_min: float, setup_labor_rate: float,
+                  overhead_pct: float) -> tuple[float, float, float, float, float]:
+    raw_mass      = V_raw * mat_density
+    material_cost = raw_mass * mat_price
+    machine_cost  = (mach_time_min / 60) * machine_rate
+    setup_cost    = (setup_time_min / 60) * setup_labor_rate
+
+    subtotal   = material_cost + machine_cost + tool_cost + setup_cost
+    overhead   = subtotal * (overhead_pct / 100)
+    total_cost = subtotal + overhead
+    return material_cost, machine_cost, setup_cost, overhead, total_cost
+
+def compute_quote(ops: pd.DataFrame, feed_mode: FeedMode, ae_mode: AeMode,
+                  V_raw: float, V_chip: float, mat_density: float,
+                  mat_price: float, machine_rate: float, tool_cost: float,
+                  setup_time_min: float, setup_labor_rate: float,
+                  overhead_pct: float):
+    def col(name: str) -> np.ndarray:
+        return ops[name].to_numpy(dtype=np.float64)
+
+    feed, ae, mrr, chip_vol, time_min = compute_ops(
+        col("Teeth"), col("RPM"), col("f_z (mm)"), col("Feed (mm/min)"),
+        col("a_p (mm)"), col("a_e (mm)"), col("Tool Ø (mm)"), col("ae % (of Ø)"),
+        col("Volume Share"), float(V_chip),
+        feed_mode is FeedMode.CALCULATE, ae_mode is AeMode.PERCENT,
+    )
 
-    op_results.append({
-        "Operation":         row["Operation"],
+    op_df = pd.DataFrame({
+        "Operation":         ops["Operation"].to_numpy(),
         "Feed (mm/min)":     feed,
         "aₑ (mm)":           ae,
         "MRR (mm³/min)":     mrr,
         "Chip Volume (mm³)": chip_vol,
         "Time (min)":        time_min,
-    })
+    }, copy=False)
 
-op_df = pd.DataFrame(op_results)
+    mach_time_min  = op_df["Time (min)"].sum()
+    total_time_min = mach_time_min + setup_time_min
+
+    material_cost, machine_cost, setup_cost, overhead, total_cost = compute_costs(
+        V_raw, mat_density, mat_price, float(mach_time_min), machine_rate,
+        tool_cost, setup_time_min, setup_labor_rate, overhead_pct,
+    )
+
+    cost_df = pd.DataFrame({
+        "Cost Component": _COST_LABELS,
+        "Amount ($)":     np.array([material_cost, machine_cost, tool_cost,
+                                    setup_cost, overhead], dtype=np.float64),
+    })
+    return op_df, cost_df, mach_time_min, total_time_min, total_cost
+
+# Only recompute when an input actually changed (e.g. not on the PDF button).
+# Modes are keyed by value because the Enum classes are redefined each rerun,
+# and ops.equals() treats the NaNs of blank editor rows as equal.
+ops = st.session_state.op_df
+quote_args = (feed_mode, ae_mode, V_raw, V_chip, mat_density, mat_price,
+              machine_rate, tool_cost, setup_time_min, setup_labor_rate,
+              overhead_pct)
+scalar_key = (L, W, H, V_final, feed_mode.value, ae_mode.value, *quote_args[2:])
+prev_ops = st.session_state.get("quote_ops")
+if (st.session_state.get("quote_key") != scalar_key
+        or prev_ops is None or not ops.equals(prev_ops)):
+    st.session_state.quote = compute_quote(ops, *quote_args)
+    st.session_state.quote_key = scalar_key
+    st.session_state.quote_ops = ops.copy()
+op_df, cost_df, mach_time_min, total_time_min, total_cost = st.session_state.quote
 
 # ───────────────────────────────────────────────────────────────
 # 6) CYCLE-TIME TABLE & CHART
@@ -140,15 +227,13 @@ op_df = pd.DataFrame(op_results)
 st.subheader("Cycle Time Breakdown")
 st.dataframe(op_df, use_container_width=True)
 
-st.altair_chart(
-    alt.Chart(op_df).mark_bar().encode(
+@st.cache_data
+def build_cycle_chart(df: pd.DataFrame) -> dict:
+    return alt.Chart(df).mark_bar().encode(
         x="Operation", y="Time (min)", tooltip=["Time (min)"]
-    ).properties(height=300),
-    use_container_width=True,
-)
+    ).properties(height=300).to_dict()
 
-mach_time_min  = op_df["Time (min)"].sum()
-total_time_min = mach_time_min + setup_time_min
+st.vega_lite_chart(build_cycle_chart(op_df), use_container_width=True)
 
 st.subheader("⏱️ Total Production Time")
 st.write(f"Machining time : `{mach_time_min:.2f} min`")
@@ -159,22 +244,6 @@ st.divider()
 # ───────────────────────────────────────────────────────────────
 # 7) COST SUMMARY
 # ───────────────────────────────────────────────────────────────
-raw_mass      = V_raw * mat_density
-material_cost = raw_mass * mat_price
-machine_cost  = (mach_time_min / 60) * machine_rate
-setup_cost    = (setup_time_min / 60) * setup_labor_rate
-
-subtotal   = material_cost + machine_cost + tool_cost + setup_cost
-overhead   = subtotal * (overhead_pct / 100)
-total_cost = subtotal + overhead
-
-cost_df = pd.DataFrame({
-    "Cost Component": ["Material", "Machine", "Tool wear",
-                       "Setup labor", "Overhead"],
-    "Amount ($)":     [material_cost, machine_cost, tool_cost,
-                       setup_cost, overhead],
-})
-
 st.subheader("Cost Summary")
 st.dataframe(cost_df, use_container_width=True)
 st.markdown(f"### **Total Cost: ${total_cost:,.2f}**")
@@ -182,37 +251,55 @@ st.markdown(f"### **Total Cost: ${total_cost:,.2f}**")
 # ───────────────────────────────────────────────────────────────
 # 8) PDF EXPORT
 # ───────────────────────────────────────────────────────────────
+_NORM_TBL = str.maketrans({
+    "\u2011": "-", "\u2013": "-", "\u2014": "-",
+    "\u2091": "e",  # subscript e (aₑ) has no Helvetica glyph
+})
+
 def normalize(txt: str) -> str:
-    return txt.replace("\u2011", "-").replace("\u2013", "-").replace("\u2014", "-")
-
-class PDF(FPDF):
-    def header(self):
-        self.set_font("Helvetica", "B", 14)
-        self.cell(0, 10, "Machining Quote",
-                  new_x="LMARGIN", new_y="NEXT", align="C")
-        self.ln(4)
-
-    def add_table(self, df: pd.DataFrame, title: str):
-        self.set_font("Helvetica", "B", 11)
-        self.cell(0, 8, title, new_x="LMARGIN", new_y="NEXT")
-        self.set_font("Helvetica", size=8)
-        col_w = self.w / (len(df.columns) + 1)
-        for col in df.columns:
-            self.cell(col_w, 6, str(col), border=1, align="C")
-        self.ln()
-        for _, row in df.iterrows():
-            for val in row:
-                txt = f"{val:,.3f}" if isinstance(val, (int, float)) else normalize(str(val))
-                self.cell(col_w, 6, txt, border=1, align="C")
-            self.ln()
-        self.ln(4)
-
-def build_pdf() -> bytes:
-    pdf = PDF()
-    pdf.add_page()
-    pdf.set_font("Helvetica", size=9)
-
-    pdf.cell(0, 8, "Block & Volume", new_x="LMARGIN", new_y="NEXT")
+    return txt.translate(_NORM_TBL)
+
+_TABLE_STYLE = TableStyle([
+    ("FONT",     (0, 0), (-1, -1), "Helvetica", 8),
+    ("FONT",     (0, 0), (-1, 0),  "Helvetica-Bold", 8),
+    ("GRID",     (0, 0), (-1, -1), 0.5, colors.black),
+    ("ALIGN",    (0, 0), (-1, -1), "CENTER"),
+    ("VALIGN",   (0, 0), (-1, -1), "MIDDLE"),
+])
+
+def _draw_header(canvas, doc):
+    canvas.saveState()
+    canvas.setFont("Helvetica-Bold", 14)
+    canvas.drawCentredString(doc.pagesize[0] / 2, doc.pagesize[1] - 40,
+                             "Machining Quote")
+    canvas.restoreState()
+
+_NUM_FMT = "{:,.3f}".format
+
+def table_flowables(df: pd.DataFrame, title: str, styles) -> list:
+    # Format column by column so each column uses one formatter
+    str_cols = [
+        list(map(_NUM_FMT, df[col].tolist()))
+        if pd.api.types.is_numeric_dtype(df[col])
+        else [normalize(str(val)) for val in df[col].tolist()]
+        for col in df.columns
+    ]
+    header = [normalize(str(col)) for col in df.columns]
+    data = [header] + [list(row) for row in zip(*str_cols)]
+    return [
+        Paragraph(escape(title), styles["Heading4"]),
+        Table(data, style=_TABLE_STYLE, hAlign="LEFT"),
+        Spacer(1, 12),
+    ]
+
+@st.cache_data(max_entries=16)
+def build_pdf(L: float, W: float, H: float,
+              V_raw: float, V_final: float, V_chip: float,
+              op_df: pd.DataFrame, cost_df: pd.DataFrame,
+              total_time_min: float, total_cost: float) -> bytes:
+    styles = getSampleStyleSheet()
+    story = [Paragraph(escape("Block & Volume"), styles["Heading4"])]
+
     blk = {
         "L×W×H (mm)": f"{L} × {W} × {H}",
         "Raw Volume (mm³)":   f"{V_raw:,.0f}",
@@ -222,22 +309,25 @@ def build_pdf() -> bytes:
         "Total Cost ($)":         f"{total_cost:,.2f}",
     }
     for k, v in blk.items():
-        pdf.cell(0, 6, f"{k}: {v}", new_x="LMARGIN", new_y="NEXT")
-    pdf.ln(2)
+        story.append(Paragraph(escape(f"{k}: {v}"), styles["Normal"]))
+    story.append(Spacer(1, 12))
 
     # Operation & cost tabloları
-    pdf.add_table(op_df[["Operation", "aₑ (mm)", "Time (min)"]], "Operation Breakdown")
-    pdf.add_table(cost_df, "Cost Summary")
+    story += table_flowables(op_df[["Operation", "aₑ (mm)", "Time (min)"]],
+                             "Operation Breakdown", styles)
+    story += table_flowables(cost_df, "Cost Summary", styles)
 
     buffer = BytesIO()
-    pdf.output(buffer)
+    doc = SimpleDocTemplate(buffer, pagesize=A4, title="Machining Quote")
+    doc.build(story, onFirstPage=_draw_header, onLaterPages=_draw_header)
     return buffer.getvalue()
 
 # ——— PDF butonu
 if st.button("Generate PDF Quote"):
     st.download_button(
         "Download PDF",
-        data=build_pdf(),
+        data=build_pdf(L, W, H, V_raw, V_final, V_chip,
+                       op_df, cost_df, total_time_min, total_cost),
         file_name="machining_quote.pdf",
         mime="application/pdf",
     )
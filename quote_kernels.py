@@ -0,0 +1,27 @@
+# Per-operation machining math, JIT-compiled once per process by Numba.
+# Lives outside machining_quote_app.py because Streamlit re-executes the
+# entry script on every rerun, which would rebuild the Dispatcher each time.
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def compute_ops(teeth, rpm, fz, feed_in, ap, ae_in, tool_d, ae_pct, vol_share,
+                V_chip, calc_feed, use_pct):
+    n = teeth.shape[0]
+    out_feed = np.empty(n)
+    out_ae   = np.empty(n)
+    out_mrr  = np.empty(n)
+    out_chip = np.empty(n)
+    out_time = np.empty(n)
+    for i in range(n):
+        feed = teeth[i] * rpm[i] * fz[i] if calc_feed else feed_in[i]
+        ae   = tool_d[i] * ae_pct[i] / 100 if use_pct else ae_in[i]
+        mrr  = feed * ap[i] * ae
+        chip = V_chip * vol_share[i]
+        out_feed[i] = feed
+        out_ae[i]   = ae
+        out_mrr[i]  = mrr
+        out_chip[i] = chip
+        out_time[i] = chip / mrr / 60 if mrr > 0 else 0.0
+    return out_feed, out_ae, out_mrr, out_chip, out_time
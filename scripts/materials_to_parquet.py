@@ -0,0 +1,9 @@
+# One-off: regenerate data/materials.parquet after editing data/materials.csv
+#   python scripts/materials_to_parquet.py
+import pandas as pd
+from pathlib import Path
+
+data_dir = Path(__file__).resolve().parent.parent / "data"
+MATS = pd.read_csv(data_dir / "materials.csv")
+MATS.to_parquet(data_dir / "materials.parquet", compression="zstd", index=False)
+print(f"Wrote {len(MATS)} materials to {data_dir / 'materials.parquet'}")